@@ -1,7 +1,7 @@
+import heapq
 import os
 import sys
 
-import subprocess
 import time
 
 from enum import Enum, auto
@@ -10,6 +10,7 @@ from typing import Dict, List, Tuple
 
 # constants
 TICK_RATE = 0.01
+CLEAR_SCREEN = '\x1b[2J\x1b[H'                  # clear screen, cursor to top
 DIRECTIONS = frozenset(('l', 'r', 'f', 'b'))
 GRAPHICS = {
     '#': '🧱',
@@ -20,6 +21,25 @@ GRAPHICS = {
     '@': '🪺',
 }
 
+TILE_WALL = 0                                   # tile codes stored in Grid
+TILE_GRASS = 1
+TILE_EGG = 2
+TILE_NEST = 3
+TILE_PAN = 4
+TILE_CLOSED = 5
+
+TILES = {                                       # level char to tile code
+    '#': TILE_WALL,
+    '.': TILE_GRASS,
+    '0': TILE_EGG,
+    'O': TILE_NEST,
+    'P': TILE_PAN,
+    '@': TILE_CLOSED,
+}
+GRAPHICS_BYTES = tuple(GRAPHICS[c] for c in sorted(TILES, key=TILES.get))
+GRAPHICS_TABLE = str.maketrans(                 # for str.translate
+    {chr(t): g for t, g in enumerate(GRAPHICS_BYTES)})
+
 
 # classes
 class Axis(Enum):
@@ -71,41 +91,103 @@ class Direction:
         return Direction.DIR_DCT[self._direction][1]
 
 
-    def get_next(self, coord: Tuple[int, int]) -> Tuple[int, int]:
-        """Returns the next coord with respect to the instance's direction."""
-        i, j = coord
-        return (i + self._i, j + self._j)
+Direction._CACHE = {d: Direction(d) for d in DIRECTIONS}   # one per direction
 
 
 class Grid:
-    """Handles grid manipulations and grid displays."""
+    """Handles grid manipulations and grid displays.
+
+    The grid is stored as a flat row-major bytearray of tile codes,
+    which are only converted to their emoji versions when displayed.
+    It is surrounded by a border of walls so that eggs at the edge
+    of the grid are stopped without bounds checks.
+    """
 
-    def __init__(self, grid: List[List[str]]):
-        self._grid = [list(i) for i in grid]
+    def __init__(self, grid: List[str]):
         self._rows = len(grid)
         self._cols = len(grid[0])
+        self._stride = self._cols + 2           # row length with border
+        self._grid = bytearray(self._stride * (self._rows+2))   # all walls
+        self._repr_cache: str | None = None     # rendered grid, if current
+
+        for i, row in enumerate(grid):
+            offset = (i+1)*self._stride + 1
+            for j, char in enumerate(row[:self._cols]):
+                self._grid[offset + j] = TILES.get(char, TILE_WALL)
 
 
     def __repr__(self) -> str:
         """Returns the grid in string form."""
-        return '\n'.join((''.join(i) for i in self._grid))
+        if self._repr_cache is None:            # render only after rolls
+            lgrid = self._grid
+            (c, stride) = (self._cols, self._stride)
+            self._repr_cache = '\n'.join((
+                lgrid[k:k + c].decode('latin-1').translate(GRAPHICS_TABLE)
+                for k in range(stride + 1, len(lgrid) - stride, stride)))
 
+        return self._repr_cache
 
-    def peek(self, coord: Tuple[int, int]) -> str | None:
-        """Returns the object in the grid coord, if any."""
 
+    def index(self, coord: Tuple[int, int]) -> int:
+        """Returns the index of the grid coord in the grid buffer."""
         (i, j) = coord
+        return (i+1)*self._stride + j + 1
 
-        if 0 <= i < self._rows and 0 <= j < self._cols:
-            return self._grid[i][j]             # in bounds
-        else:
-            return None                         # out of bounds
 
+    def coord(self, index: int) -> Tuple[int, int]:
+        """Returns the grid coord of the index in the grid buffer."""
+        (i, j) = divmod(index, self._stride)
+        return (i - 1, j - 1)
 
-    def update(self, coord: Tuple[int, int], char: str) -> None:
-        """Places char on grid coord."""
-        (i, j) = coord
-        self._grid[i][j] = char
+
+    def offset(self, direction: Direction) -> int:
+        """Returns the index offset of one step towards direction."""
+        (i, j) = direction.coord
+        return i*self._stride + j
+
+
+    def roll(self, eggs: List[int], step: int,
+             moves: int) -> Tuple[List[int], List[int], int, bool]:
+        """Moves each egg index in eggs by step, where eggs are
+        sorted so that the leading eggs go first.
+
+        Returns the eggs that can still move, the eggs that stopped moving,
+        the points gained, and whether any tile changed.
+        """
+        lgrid = self._grid
+        new_eggs = []
+        still_eggs = []
+        points = 0
+
+        move_egg = new_eggs.append              # bound once for the loop
+        stop_egg = still_eggs.append
+        nest_points = 10 + moves
+
+        for cur in eggs:                        # process each moveable egg
+            nxt = cur + step                    # adjacent index
+            adj = lgrid[nxt]                    # object adjacent to egg
+
+            if adj == TILE_GRASS:
+                lgrid[nxt] = TILE_EGG
+                lgrid[cur] = TILE_GRASS
+
+                move_egg(nxt)                   # egg can still move
+
+            elif adj == TILE_PAN:
+                lgrid[cur] = TILE_GRASS         # cook egg
+                points -= 5
+            elif adj == TILE_NEST:
+                lgrid[nxt] = TILE_CLOSED        # close nest
+                lgrid[cur] = TILE_GRASS
+                points += nest_points
+            else:
+                stop_egg(cur)                   # egg stays put
+
+        changed = len(still_eggs) < len(eggs)   # some egg left its tile
+
+        if changed:
+            self._repr_cache = None             # grid has changed
+        return new_eggs, still_eggs, points, changed
 
 
 class Leaderboard:
@@ -117,10 +199,8 @@ class Leaderboard:
     PADDING = 1          # gap between text and dividers when displaying
 
     def __init__(self, player_w_scores: List[Tuple[str, int]]):
-        self.player_w_scores = player_w_scores
-        self._scores = [s for p, s in player_w_scores]
-        self.min_score = min(self._scores) if self._scores else 0
-        self.sort()
+        self._heap = [(s, p) for p, s in player_w_scores]  # min-heap of
+        heapq.heapify(self._heap)                          # score - player
 
 
     def __repr__(self) -> str:
@@ -131,10 +211,18 @@ class Leaderboard:
         return '\n'.join(str_rep)
 
 
-    def sort(self) -> None:
-        """Sorts the leaderboard by scores in decreasing order in place."""
-        self.player_w_scores.sort(key=(lambda tup: tup[::-1]), reverse=True)
-        self._scores.sort(reverse=True)
+    @property
+    def min_score(self) -> int:
+        """Returns the minimum score in the leaderboard, if any."""
+        return self._heap[0][0] if self._heap else 0
+
+
+    @property
+    def player_w_scores(self) -> List[Tuple[str, int]]:
+        """Returns the player - score pairs sorted by scores
+        in decreasing order.
+        """
+        return [(p, s) for s, p in sorted(self._heap, reverse=True)]
 
 
     def file_append(self) -> None:
@@ -143,41 +231,33 @@ class Leaderboard:
         path = os.path.join('.', 'level', sys.argv[1])
 
         with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            lines = f.read().split('\n')
 
         r = int(lines[0])                       # amount of level rows
-
-        if '\n' not in lines[r + 1]:            # avoids concatenation of last
-            lines[r + 1] += '\n'                # level row and leaderboards
-
-        lines[r + 2:] = repr(self)
-
+        level = '\n'.join(lines[:r + 2])        # newline avoids concatenation
+                                                # of last level row and scores
         with open(path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+            f.write(f'{level}\n{self!r}')
 
 
     def evaluate(self, score: int) -> None:
         """If the score is above the minimum score in the leaderboards,
         or there are less than Leaderboard.LENGTH scores in the leaderboards,
-        update and sort the leaderboard after prompting the name of the player.
+        update the leaderboard after prompting the name of the player.
         """
 
         LENGTH = Leaderboard.LENGTH
-        score_len = len(self.player_w_scores)
+        heap = self._heap
 
-        if score_len < LENGTH or self.min_score < score:
+        if len(heap) < LENGTH or self.min_score < score:
 
             player_name = input('Please input your name: ')
 
-            self.player_w_scores.append((player_name, score))
-            self._scores.append(score)
-            self.sort()
-
-            while score_len > LENGTH:           # remove excess scores
-                self.player_w_scores.pop()
-                self._scores.pop()
+            if len(heap) < LENGTH:
+                heapq.heappush(heap, (score, player_name))
+            else:                               # replace the minimum score
+                heapq.heappushpop(heap, (score, player_name))
 
-            self.min_score = min(self._scores)
             self.file_append()                  # append scores to level file
 
 
@@ -187,13 +267,13 @@ class Leaderboard:
         path = os.path.join('.', 'level', sys.argv[1])
 
         with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            lines = f.read().split('\n')
 
         r = int(lines[0])
-        lines = lines[:r + 2]                   # trim level file lines
+        level = '\n'.join(lines[:r + 2])        # trim level file lines
 
         with open(path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+            f.write(f'{level}\n')
 
 
     def display(self) -> None:
@@ -243,17 +323,13 @@ def get_level_info() -> Tuple[int, int, List[str], List[str]]:
     path = os.path.join('.', 'level', sys.argv[1])
     
     with open(path, encoding='utf-8') as f:
-        rows = int(f.readline())
-        moves = int(f.readline())
+        lines = f.read().split('\n')            # read the file all at once
 
-        grid = []
-        for i in range(rows):
-            grid.append(f.readline().replace('\n', ''))
+    rows = int(lines[0])
+    moves = int(lines[1])
+    grid = lines[2:rows + 2]
+    scores = lines[rows + 2:rows + 2 + Leaderboard.LENGTH]
 
-        scores = []
-        for i in range(Leaderboard.LENGTH):
-            scores.append(f.readline().replace('\n', ''))
-    
     return rows, moves, grid, scores
 
 
@@ -266,26 +342,23 @@ def process_stage() -> Tuple[Grid, int, List[Tuple[int, int]], Leaderboard]:
     moves, grid_, scores_ = get_level_info()[1:]
 
     grid = process_grid(grid_)
-    egg_coords = get_coords(grid, '🥚')
+    egg_coords = get_coords(grid, TILE_EGG)
     scores = process_scores(scores_)
     return grid, moves, egg_coords, scores
 
 
 def process_grid(grid: List[str]) -> Grid:
     """Processes raw characters from the stage grid
-    into their respective emoji versions.
+    into their respective tile codes.
 
     Returns a Grid.
     """
-    return Grid([[GRAPHICS[j] if j in GRAPHICS else j
-                  for j in i]
-                  for i in grid])
+    return Grid(grid)
 
 
 def process_scores(scores: List[str]) -> Leaderboard:
-    """Returns a list of Leaderboard.LENGTH or less pairs of player names and
-    their scores from the raw scores list. The list will be sorted
-    according to the player scores in decreasing order.
+    """Returns a Leaderboard of Leaderboard.LENGTH or less pairs of
+    player names and their scores from the raw scores list.
     """
 
     assert len(scores) <= Leaderboard.LENGTH
@@ -302,75 +375,78 @@ def process_scores(scores: List[str]) -> Leaderboard:
 
             leaderboard.append((plyr, scre))    # player - score tuple pair
 
-    leaderboard.sort(key=lambda tup: tup[::-1], reverse=True)
-
     return Leaderboard(leaderboard)
 
 
-def process_input(input_dir: str) -> Direction | None:
-    """Checks if the input string is 'quit',
-    else finds the first valid character in the input string.
-    """
-    assert is_valid(input_dir)
+def parse_input(input_dir: str) -> Direction | str | None:
+    """Returns 'quit' if the input string is 'quit',
+    else the Direction of the first valid character in the input string.
 
+    Returns None if the input string is invalid.
+    """
     input_dir = input_dir.lower().strip()
 
     if input_dir == 'quit':
-        return None
+        return input_dir
 
     for i in input_dir:
         if i in DIRECTIONS:
-            direction = Direction(i)
-            break
-
-    return direction
+            return Direction._CACHE[i]
 
+    return None
 
-def is_valid(input_dir: str) -> bool:
-    """Checks if the input string is 'quit',
-    else checks if 'l', 'r', 'f', or 'b' is in the input string.
-    """
-    input_dir = input_dir.lower().strip()
 
-    if input_dir == 'quit':
-        return True
-
-    return any((i in input_dir for i in DIRECTIONS))
+# display functions
+def has_ansi() -> bool:
+    """Checks if the terminal screen can be cleared with CLEAR_SCREEN."""
+    return not (os.name == 'nt' and not os.environ.get('WT_SESSION'))
 
 
-# display functions
 def clear_screen() -> None:
     """Clears the terminal screen, if any."""
-    try:
-        if sys.stdout.isatty():
-            clear_cmd = 'cls' if os.name == 'nt' else 'clear'
-            subprocess.run([clear_cmd])
-    except FileNotFoundError:
-        os.system('cls')
+    if not sys.stdout.isatty():
+        return
+
+    if has_ansi():
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+    else:
+        os.system('cls')                        # console may lack ANSI support
 
 
 def display(grid: Grid, moves: int = 0, all_moves: List[str] = [],
             points: int = 0, is_moving: bool = False) -> None:
     """Clears the terminal and displays the grid
-    followed by the stats, if no eggs are moving, for TICK_RATE seconds
+    followed by the stats, if no eggs are moving.
+
+    Frames of moving eggs are held for TICK_RATE seconds, including
+    the time spent drawing them.
     """
-    clear_screen()
-    display_grid(grid)
+    start = time.perf_counter()
+
+    if sys.stdout.isatty() and has_ansi():      # build the whole frame so it
+        frame = [CLEAR_SCREEN]                  # is written all at once
+    else:
+        frame = []
+        clear_screen()                          # cls, if there is a terminal
+
+    frame += (repr(grid), '\n')
     if not is_moving:
-        display_stats(moves, all_moves, points)
-    time.sleep(TICK_RATE)
+        frame.append(format_stats(moves, all_moves, points))
 
+    sys.stdout.write(''.join(frame))
+    sys.stdout.flush()
 
-def display_grid(grid: Grid) -> None:
-    """Displays the current state of the stage grid."""
-    print(grid)
+    if is_moving:                               # other frames wait for input
+        elapsed = time.perf_counter() - start
+        time.sleep(max(0.0, TICK_RATE - elapsed))
 
 
-def display_stats(moves: int, all_moves: List[str], points: int) -> None:
-    """Displays the current stats of the game."""
-    print(f'Previous Moves: {''.join(all_moves)}')
-    print(f'Remaining Moves: {moves}')
-    print(f'Points: {points}')
+def format_stats(moves: int, all_moves: List[str], points: int) -> str:
+    """Returns the current stats of the game in string form."""
+    return (f'Previous Moves: {''.join(all_moves)}\n'
+            f'Remaining Moves: {moves}\n'
+            f'Points: {points}\n')
 
 
 def display_leaderboard(leaderboard: Leaderboard) -> None:
@@ -382,12 +458,21 @@ def display_leaderboard(leaderboard: Leaderboard) -> None:
 
 
 # game functions
-def get_coords(grid: Grid, char: str) -> List[Tuple[int, int]]:
-    """Returns a list of tuple-coordinates of all char in the grid."""
+def get_coords(grid: Grid, tile: int) -> List[Tuple[int, int]]:
+    """Returns a list of tuple-coordinates of all tile in the grid."""
     lgrid = grid._grid
-    (r, c) = (grid._rows, grid._cols)
-    return [(i, j) for i in range(r) if char in lgrid[i]
-                   for j in range(c) if lgrid[i][j] == char]
+    (c, stride) = (grid._cols, grid._stride)
+    end = len(lgrid) - stride                   # skip the top and bottom
+    coords = []                                 # border rows
+
+    k = lgrid.find(tile, stride, end)           # scan the buffer in C
+    while k != -1:
+        (i, j) = divmod(k, stride)
+        if 0 < j <= c:                          # skip the border columns
+            coords.append((i - 1, j - 1))
+        k = lgrid.find(tile, k + 1, end)
+
+    return coords
 
 
 def game_logic(
@@ -396,58 +481,33 @@ def game_logic(
     ) -> Tuple[bool, int, List[Tuple[int, int]], int]:
     """This is the main logic of the egg rolling game.
 
-    The list of egg_coords will be sorted based on axis
-    and polarity to avoid overlapping eggs.
+    The eggs are converted to indices in the flat grid buffer, which
+    will be sorted based on polarity to avoid overlapping eggs.
 
     Then, each moveable egg will be moved according to the
-    input_dir until it hits an immovable character.
+    input_dir until it hits an immovable character, where
+    it is kept as one of the remaining eggs.
 
     Returns the game variables once there are no moveable eggs.
     """
 
-    axis = input_dir.axis                       # axis of direction
-    polarity = input_dir.polarity               # sign of direction
-
-    if axis is Axis.HORIZONTAL:                 # sort using col/row if axis
-        sort_key = (lambda tup: tup[::-1])      # is horizontal/vertical
-    else:
-        sort_key = None
-    is_rev = polarity is Axis.NEGATIVE          # set list popping order
-
-    while egg_coords:                           # loop while eggs are moveable
+    step = grid.offset(input_dir)               # index offset of direction
+    eggs = [grid.index(coord) for coord in egg_coords]
+    is_rev = input_dir.polarity is Axis.POSITIVE    # leading eggs go first
+    still_eggs = []                             # eggs that stopped moving
 
-        new_egg_coords = []
-        egg_coords.sort(key=sort_key,           # avoids egg overlaps
-                        reverse=is_rev)
+    while eggs:                                 # loop while eggs are moveable
 
-        while egg_coords:                       # process each moveable egg
+        eggs.sort(reverse=is_rev)               # avoids egg overlaps
+        (eggs, stopped, gained, changed) = grid.roll(eggs, step, moves)
 
-            cur = egg_coords.pop()              # current egg coords
-            nxt = input_dir.get_next(cur)       # adjacent coords
-            adj = grid.peek(nxt)                # object adjacent to egg
+        still_eggs += stopped
+        points += gained
 
-            if adj == '🟩':
-                grid.update(nxt, '🥚')
-                grid.update(cur, '🟩')
-
-                new_egg_coords.append(nxt)      # egg can still move
-
-            else:
-                if adj == '🍳':
-                    grid.update(nxt, '🍳')     # cook egg
-                    grid.update(cur, '🟩')
-                    points -= 5
-                elif adj == '🪹':
-                    grid.update(nxt, '🪺')     # close nest
-                    grid.update(cur, '🟩')
-                    points += 10 + moves
-
-        egg_coords = new_egg_coords
-
-        if __name__ == '__main__':              # doesn't display the grid
+        if changed and __name__ == '__main__':  # skip unchanged frames and
             display(grid, is_moving=True)       # when file is imported
 
-    egg_coords = get_coords(grid, '🥚')        # update coords
+    egg_coords = [grid.coord(k) for k in still_eggs]    # remaining eggs
 
     state = bool(moves-1 and egg_coords)        # game ends when there are
                                                 # no more eggs or no more moves
@@ -472,12 +532,11 @@ def main() -> None:
         display(grid, moves, all_moves, points)
 
         user_input = input('Enter a move: ')
-        if not is_valid(user_input):
-            continue
-
-        input_dir = process_input(user_input)   # convert input string to 
-                                                # Direction or None type
+        input_dir = parse_input(user_input)     # convert input string to
+                                                # Direction, 'quit', or None
         if input_dir is None:
+            continue
+        elif input_dir == 'quit':
             break
         else:
             all_moves.append(repr(input_dir))